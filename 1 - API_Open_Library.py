@@ -1,5 +1,7 @@
 import aiohttp
 import asyncio
+import csv
+import orjson
 import pandas as pd
 import logging
 import os
@@ -9,6 +11,7 @@ WORK_URL = "https://openlibrary.org/works/{work_id}.json"
 RATINGS_URL = "https://openlibrary.org/works/{work_id}/ratings.json"
 
 OUTPUT_FILE = "fiction_books.csv"
+FIELDS = ["work_id", "title", "authors", "description", "avg_rating"]
 
 # Configuración de logging
 logging.basicConfig(
@@ -21,16 +24,17 @@ async def fetch(session, url):
     try:
         async with session.get(url, timeout=20) as resp:
             if resp.status == 200:
-                return await resp.json()
+                return orjson.loads(await resp.read())
             else:
                 logging.warning(f"Error {resp.status} en {url}")
     except Exception as e:
         logging.error(f"Fallo en {url}: {e}")
     return None
 
-async def get_work_details(session, work_id, authors):
+async def get_work_details(session, work_id, authors, sem):
     """Trae detalles de un work + ratings."""
-    work_data = await fetch(session, WORK_URL.format(work_id=work_id))
+    async with sem:
+        work_data = await fetch(session, WORK_URL.format(work_id=work_id))
     if not work_data:
         return None
 
@@ -40,7 +44,8 @@ async def get_work_details(session, work_id, authors):
         desc = desc.get("value")
 
     # ratings
-    ratings_data = await fetch(session, RATINGS_URL.format(work_id=work_id))
+    async with sem:
+        ratings_data = await fetch(session, RATINGS_URL.format(work_id=work_id))
     avg_rating = None
     if ratings_data:
         avg_rating = ratings_data.get("summary", {}).get("average")
@@ -53,7 +58,7 @@ async def get_work_details(session, work_id, authors):
         "avg_rating": avg_rating
     }
 
-async def process_page(session, page, limit, concurrency):
+async def process_page(session, page, limit, sem):
     """Procesa una página completa de búsqueda."""
     search_url = SEARCH_URL.format(limit=limit, page=page)
     search_data = await fetch(session, search_url)
@@ -67,49 +72,61 @@ async def process_page(session, page, limit, concurrency):
             continue
         work_id = work_key.split("/")[-1]
         authors = doc.get("author_name", [])
-        tasks.append(get_work_details(session, work_id, authors))
+        tasks.append(get_work_details(session, work_id, authors, sem))
 
-    # Ejecutar con límite de concurrencia
-    sem = asyncio.Semaphore(concurrency)
-
-    async def bound_task(task):
-        async with sem:
-            return await task
-
-    results = await asyncio.gather(*[bound_task(t) for t in tasks])
+    # El límite de concurrencia lo aplica el semáforo compartido en cada fetch
+    results = await asyncio.gather(*tasks)
     return [r for r in results if r]
 
-async def main(limit=100, pages=100, concurrency=10):
+async def main(limit=100, pages=100, concurrency=10, page_concurrency=4):
     """Orquestador principal."""
-    connector = aiohttp.TCPConnector(limit_per_host=concurrency)
+    # Conexiones keep-alive reutilizables y DNS cacheado durante todo el scraping
+    connector = aiohttp.TCPConnector(
+        limit=concurrency * 4,
+        limit_per_host=concurrency,
+        ttl_dns_cache=300,
+        keepalive_timeout=60,
+    )
+    sem = asyncio.Semaphore(concurrency)
     async with aiohttp.ClientSession(connector=connector) as session:
 
         # Detectar si ya existe un CSV
         if os.path.exists(OUTPUT_FILE):
-            existing = pd.read_csv(OUTPUT_FILE)
-            done_ids = set(existing["work_id"].astype(str))
+            # Solo hace falta la columna de IDs, leída directamente como texto
+            existing = pd.read_csv(OUTPUT_FILE, usecols=["work_id"], dtype={"work_id": str})
+            done_ids = set(existing["work_id"].dropna())
             logging.info(f"Reanudando. Ya hay {len(done_ids)} libros guardados.")
         else:
             done_ids = set()
 
-        for page in range(1, pages + 1):
-            logging.info(f"Procesando página {page}/{pages}...")
-            results = await process_page(session, page, limit, concurrency)
-
-            # Filtrar duplicados
-            new_results = [r for r in results if r["work_id"] not in done_ids]
-
-            if new_results:
-                df = pd.DataFrame(new_results)
-                # Guardar en CSV (append si existe)
-                if not os.path.exists(OUTPUT_FILE):
-                    df.to_csv(OUTPUT_FILE, index=False, mode="w")
+        # Un único archivo abierto en modo append durante todo el scraping
+        is_new = not os.path.exists(OUTPUT_FILE)
+        with open(OUTPUT_FILE, "a", buffering=1 << 20, newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS, lineterminator="\n")
+            if is_new:
+                writer.writeheader()
+
+            # Varias páginas en vuelo a la vez, para que una página lenta no frene a las demás
+            page_sem = asyncio.Semaphore(page_concurrency)
+
+            async def do_page(page):
+                async with page_sem:
+                    logging.info(f"Procesando página {page}/{pages}...")
+                    results = await process_page(session, page, limit, sem)
+
+                # Filtrar y guardar sin `await` de por medio: el event loop
+                # serializa la escritura entre páginas
+                new_results = [r for r in results if r["work_id"] not in done_ids]
+
+                if new_results:
+                    writer.writerows(new_results)
+                    f.flush()
+                    logging.info(f"Página {page}: guardados {len(new_results)} nuevos libros.")
+                    done_ids.update(r["work_id"] for r in new_results)
                 else:
-                    df.to_csv(OUTPUT_FILE, index=False, mode="a", header=False)
-                logging.info(f"Guardados {len(new_results)} nuevos libros.")
-                done_ids.update(r["work_id"] for r in new_results)
-            else:
-                logging.info("No había libros nuevos en esta página.")
+                    logging.info(f"Página {page}: no había libros nuevos.")
+
+            await asyncio.gather(*(do_page(page) for page in range(1, pages + 1)))
 
     logging.info("Finalizado.")
 
@@ -6,13 +6,24 @@ import logging
 import math
 import os
 import re
+import subprocess
 import sys
 import warnings
 from html import unescape
+from multiprocessing import Pool
 from pathlib import Path
 
 import pandas as pd
 
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+    # Con almacenamiento Arrow, `str.replace` corre sobre RE2 (motor DFA, sin backtracking)
+    _STRING_DTYPE = "string[pyarrow]"
+except ImportError:
+    pa = pacsv = None
+    _STRING_DTYPE = "string"
+
 # --- Configuración ----------------------------------------------------------
 warnings.filterwarnings("ignore", category=UserWarning)
 warnings.filterwarnings("ignore", message="Unverified HTTPS request")
@@ -36,80 +47,77 @@ FORBIDDEN_PATTERNS = [
     r"wikidata",
 ]
 
+# Patrones precompilados (evita la búsqueda en la caché de `re` en cada fila).
+# Los flags van en línea, `(?i)`, para que `clean_series` pueda pasar `.pattern` a RE2.
+# `\s`, `\S` y `\d` en RE2 son solo ASCII: los espacios se listan explícitamente
+# (los mismos que reconoce `re`) y los dígitos se limitan a 0-9 en ambos motores.
+_WS_CLASS = "\\s\v\x1c-\x1f\x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000"
+_FORBIDDEN_UNION_RE = re.compile(
+    "(?i)" + "|".join(f"(?:{p})" for p in FORBIDDEN_PATTERNS).replace(r"\s", f"[{_WS_CLASS}]")
+)
+_HTML_RE = re.compile(r"<[^>]+>")
+_URL_RE = re.compile(f"(?i)(?:https?|ftp)://[^{_WS_CLASS}]+|www\\.[^{_WS_CLASS}]+")
+# Las notas numéricas van en una pasada previa: en "[wikipedia [12] foo]" deben
+# desaparecer antes de que la alternativa de corchetes busque el `]` de cierre
+_REF_NUM_RE = re.compile(r"\[[0-9]+\]")
+_REF_WIKI_RE = re.compile(
+    r"(?i)\[[^\]\r\n]*?(?:wikipedia|goodreads)[^\]\r\n]*?\]"
+    r"|\([^)\r\n]*?(?:wikipedia|goodreads|pronunciation)[^)\r\n]*?\)"
+)
+_SYM_RE = re.compile(r"[\*#_]+|[-–—]{2,}")
+_PAREN_LANG_RE = re.compile(
+    r"(?i)\([^)]{0,80}(pronunciation|translation|idioma|language|traducción)[^)]*\)"
+)
+_QUOTES_RE = re.compile(r"[\"'‘’“”«»]")
+_WS_RE = re.compile(f"[{_WS_CLASS}]+")
+
 # --- Funciones de limpieza --------------------------------------------------
 
 def strip_html(text: str) -> str:
     """Elimina etiquetas HTML y decodifica entidades (&amp;, &quot;...)."""
-    if not isinstance(text, str):
-        return ""
-    text = re.sub(r"<[^>]+>", " ", text)
+    text = _HTML_RE.sub(" ", text)
     return unescape(text)
 
 
 def remove_urls(text: str) -> str:
     """Elimina URLs (http, https, www, ftp)."""
-    if not isinstance(text, str):
-        return ""
-    return re.sub(r"(?:https?|ftp)://\S+|www\.\S+", " ", text, flags=re.I)
+    return _URL_RE.sub(" ", text)
 
 
 def remove_references(text: str) -> str:
     """Elimina referencias tipo [1], [Wikipedia], (goodreads), etc."""
-    if not isinstance(text, str):
-        return ""
-    text = re.sub(r"\[\d+\]", " ", text)
-    text = re.sub(r"\[.*?(wikipedia|goodreads).*?\]", " ", text, flags=re.I)
-    text = re.sub(r"\(.*?(wikipedia|goodreads|pronunciation).*?\)", " ", text, flags=re.I)
-    return text
+    text = _REF_NUM_RE.sub(" ", text)
+    return _REF_WIKI_RE.sub(" ", text)
 
 
 def remove_symbols(text: str) -> str:
     """Quita asteriscos, guiones múltiples y símbolos repetidos."""
-    if not isinstance(text, str):
-        return ""
-    text = re.sub(r"[\*#_]+", " ", text)
-    text = re.sub(r"[-–—]{2,}", " ", text)
-    return text
+    return _SYM_RE.sub(" ", text)
 
 
 def remove_parentheses(text: str) -> str:
     """Elimina texto entre paréntesis con aclaraciones de idioma o pronunciación."""
-    if not isinstance(text, str):
-        return ""
-    return re.sub(
-        r"\([^)]{0,80}(pronunciation|translation|idioma|language|traducción)[^)]*\)",
-        " ",
-        text,
-        flags=re.I,
-    )
+    return _PAREN_LANG_RE.sub(" ", text)
 
 
 def remove_quotes(text: str) -> str:
     """Elimina comillas rectas y curvas."""
-    if not isinstance(text, str):
-        return ""
-    return re.sub(r"[\"'‘’“”«»]", "", text)
+    return _QUOTES_RE.sub("", text)
 
 
 def remove_forbidden_patterns(text: str) -> str:
     """Elimina frases o patrones indeseados."""
-    if not isinstance(text, str):
-        return ""
-    for pattern in FORBIDDEN_PATTERNS:
-        text = re.sub(pattern, " ", text, flags=re.I)
-    return text
+    return _FORBIDDEN_UNION_RE.sub(" ", text)
 
 
 def normalize_whitespace(text: str) -> str:
     """Normaliza espacios en blanco múltiples."""
-    if not isinstance(text, str):
-        return ""
-    return re.sub(r"\s+", " ", text).strip()
+    return _WS_RE.sub(" ", text).strip()
 
 
 def clean_text(text: str) -> str:
     """Limpieza completa del texto (sin etiquetas de idioma ni estadísticas)."""
-    if not isinstance(text, str) or not text.strip():
+    if not text.strip():
         return ""
 
     text = strip_html(text)
@@ -124,6 +132,22 @@ def clean_text(text: str) -> str:
     return text
 
 
+def clean_series(s: pd.Series) -> pd.Series:
+    """Versión vectorizada de `clean_text` sobre una columna completa."""
+    # El tipo se garantiza una vez por columna: los helpers de texto asumen `str`
+    s = s.fillna("").astype(_STRING_DTYPE)
+    s = s.str.replace(_HTML_RE.pattern, " ", regex=True)
+    s = s.map(unescape).astype(_STRING_DTYPE)
+    s = s.str.replace(_URL_RE.pattern, " ", regex=True)
+    s = s.str.replace(_REF_NUM_RE.pattern, " ", regex=True)
+    s = s.str.replace(_REF_WIKI_RE.pattern, " ", regex=True)
+    s = s.str.replace(_SYM_RE.pattern, " ", regex=True)
+    s = s.str.replace(_PAREN_LANG_RE.pattern, " ", regex=True)
+    s = s.str.replace(_QUOTES_RE.pattern, "", regex=True)
+    s = s.str.replace(_FORBIDDEN_UNION_RE.pattern, " ", regex=True)
+    return s.str.replace(_WS_RE.pattern, " ", regex=True).str.strip()
+
+
 def coerce_rating(val) -> float:
     """Convierte valores numéricos al rango [0, 5]."""
     try:
@@ -137,12 +161,47 @@ def coerce_rating(val) -> float:
 
 # --- Procesamiento del DataFrame -------------------------------------------
 
-def clean_dataframe(df: pd.DataFrame, min_desc_len: int = 30, drop_no_author: bool = False) -> pd.DataFrame:
-    """Limpia el DataFrame y aplica filtros básicos."""
-    # Limpieza de columnas
+def read_books_csv(path: Path) -> pd.DataFrame:
+    """Lee el CSV con el parser multihilo de Arrow (o pandas si no está pyarrow)."""
+    if pacsv is None:
+        return pd.read_csv(path)
+    table = pacsv.read_csv(
+        path,
+        read_options=pacsv.ReadOptions(use_threads=True, block_size=1 << 22),
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(
+            # Una columna vacía en todas las filas se inferiría como `null`
+            column_types={col: pa.string() for col in ["work_id", "title", "authors", "description"]},
+            strings_can_be_null=True,
+        ),
+    )
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def _clean_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Limpia las columnas de texto de un fragmento del DataFrame."""
     for col in ["title", "description"]:
-        if col in df.columns:
-            df[col] = df[col].astype(str).apply(clean_text)
+        if col in chunk.columns:
+            chunk[col] = clean_series(chunk[col])
+    return chunk
+
+
+def clean_dataframe(
+    df: pd.DataFrame, min_desc_len: int = 30, drop_no_author: bool = False, workers: int = 1
+) -> pd.DataFrame:
+    """Limpia el DataFrame y aplica filtros básicos."""
+    # La limpieza nunca alarga el texto: se descartan antes las descripciones cortas
+    if "description" in df.columns:
+        df = df[df["description"].fillna("").astype(str).str.len() >= min_desc_len].copy()
+
+    # Limpieza de columnas (en paralelo por fragmentos si hay más de un proceso)
+    if workers > 1 and len(df) > workers:
+        size = math.ceil(len(df) / workers)
+        chunks = [df.iloc[i:i + size] for i in range(0, len(df), size)]
+        with Pool(workers) as pool:
+            df = pd.concat(pool.map(_clean_chunk, chunks))
+    else:
+        df = _clean_chunk(df)
 
     if "authors" in df.columns:
         df["authors"] = df["authors"].astype(str).str.replace("nan", "", regex=False).str.replace("None", "", regex=False)
@@ -184,6 +243,7 @@ def parse_args():
     p.add_argument("--min_desc_len", type=int, default=30, help="Longitud mínima de descripción")
     p.add_argument("--drop_no_author", action="store_true", help="Eliminar filas sin autor")
     p.add_argument("--report", type=str, default="report.md", help="Archivo de reporte")
+    p.add_argument("--workers", type=int, default=1, help="Procesos para la limpieza (opt-in)")
     return p.parse_args()
 
 
@@ -200,10 +260,10 @@ def main():
         sys.exit(1)
 
     logger.info(f"Leyendo archivo: {inp_path}")
-    df = pd.read_csv(inp_path)
+    df = read_books_csv(inp_path)
 
     logger.info("Procesando limpieza...")
-    df = clean_dataframe(df, args.min_desc_len, args.drop_no_author)
+    df = clean_dataframe(df, args.min_desc_len, args.drop_no_author, args.workers)
 
     df.to_csv(out_path, index=False, encoding="utf-8")
     logger.info(f"Archivo limpio guardado: {out_path}")
@@ -213,7 +273,12 @@ def main():
     # --- Apertura automática del archivo limpio ---
     try:
         logger.info("Abriendo archivo limpio...")
-        os.system(f'open "{out_path}"')  # macOS
+        subprocess.Popen(
+            ["open", str(out_path)],  # macOS
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
         # os.startfile(out_path)  # Descomentar si usás Windows
     except Exception as e:
         logger.warning(f"No se pudo abrir automáticamente el archivo: {e}")
@@ -1,3 +1,6 @@
+import json
+import os
+
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -7,17 +10,48 @@ from sentence_transformers import SentenceTransformer
 # ======================================================
 # 1. Load model and FAISS index with caching
 # ======================================================
+def load_encoder_config():
+    """Encoder the index was built with, as recorded by the indexing notebook."""
+    if os.path.exists("libros_clean_encoder.json"):
+        with open("libros_clean_encoder.json", encoding="utf-8") as f:
+            return json.load(f)
+    # Indexes built before the notebook recorded its encoder used the FP32 PyTorch model
+    return {"model_id": "sentence-transformers/all-MiniLM-L6-v2", "backend": "torch", "file_name": None}
+
 @st.cache_resource
-def load_model():
-    return SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2", device="cpu")
+def load_model(model_id, backend, file_name):
+    # Same encoder as the index: queries and books must share one embedding space
+    model = SentenceTransformer(
+        model_id,
+        device="cpu",
+        backend=backend,
+        model_kwargs={"file_name": file_name} if file_name else None,
+    )
+    # Warm-up pass: allocate runtime buffers and tokenizer state once per process
+    model.encode(["warm-up"], normalize_embeddings=True)
+    return model
 
 @st.cache_resource
 def load_index():
-    return faiss.read_index("libros_clean.index")
+    index = faiss.read_index("libros_clean.index")
+    if hasattr(index, "hnsw"):
+        index.hnsw.efSearch = 128  # must stay >= k (100) to keep recall
+    return index
 
 @st.cache_data
 def load_metadata():
-    return pd.read_parquet("libros_clean_metadata.parquet", engine="fastparquet")
+    df = pd.read_parquet("libros_clean_metadata.parquet", engine="fastparquet")
+    # Lowercased copies used by filter_results, computed once per cached load
+    df["_authors_lc"] = df["authors"].fillna("").str.lower()
+    df["_title_lc"] = df["title"].fillna("").str.lower()
+    return df
+
+@st.cache_data(max_entries=1024)
+def encode_query(query: str, model_id, backend, file_name) -> np.ndarray:
+    # Repeated queries ("Search again", "See more results") skip the forward pass;
+    # the encoder is part of the cache key so a rebuilt index never gets stale vectors
+    model = load_model(model_id, backend, file_name)
+    return model.encode([query], normalize_embeddings=True).astype("float32")
 
 
 # ======================================================
@@ -45,13 +79,26 @@ def build_expanded_query(query: str) -> str:
 
 def filter_results(df, filters):
     """Filter results based on author or last book."""
-    results = df
+    mask = np.ones(len(df), dtype=bool)
     if "author" in filters and filters["author"]:
-        results = results[results["authors"].str.lower().str.contains(filters["author"].lower())]
+        mask &= df["_authors_lc"].str.contains(filters["author"].lower(), regex=False).to_numpy(dtype=bool)
     if "last_book" in filters and filters["last_book"]:
-        mask = results["title"].str.lower().str.contains(filters["last_book"].lower())
-        results = results[~mask]
-    return results
+        mask &= ~df["_title_lc"].str.contains(filters["last_book"].lower(), regex=False).to_numpy(dtype=bool)
+    return df[mask]
+
+
+def blend_rating(similarity: np.ndarray, ratings: np.ndarray) -> np.ndarray:
+    """Blend similarity (90%) with the min-max normalized rating (10%)."""
+    rated = ~np.isnan(ratings)
+    if rated.any():
+        min_r, max_r = ratings[rated].min(), ratings[rated].max()
+        if max_r > min_r:
+            rating_norm = (ratings - min_r) / (max_r - min_r)
+        else:
+            rating_norm = np.full_like(ratings, 0.5)
+    else:
+        rating_norm = np.full_like(ratings, 0.2)
+    return 0.9 * similarity + 0.1 * rating_norm
 
 
 # ======================================================
@@ -61,7 +108,6 @@ def main():
     st.title("📖 Fiction Book Recommender")
     st.write("Find fiction books that match your preferences based on descriptions and ratings.")
 
-    model = load_model()
     index = load_index()
     df = load_metadata()
 
@@ -92,9 +138,9 @@ def main():
     st.session_state.query_final = query_final
 
     # --- Encode and search ---
-    query_embedding = model.encode([query_final], normalize_embeddings=True)
+    query_embedding = encode_query(query_final, **load_encoder_config())
     k = 100
-    distances, indices = index.search(query_embedding.astype("float32"), k)
+    distances, indices = index.search(query_embedding, k)
     results_df = df.iloc[indices[0]].copy()
     results_df["similarity"] = distances[0]
 
@@ -108,19 +154,12 @@ def main():
     # --- Rating consideration ---
     consider_rating = st.checkbox("⭐ Consider average rating in ranking", value=True)
     if consider_rating:
-        if filtered_df["avg_rating"].notna().any():
-            min_r, max_r = filtered_df["avg_rating"].min(), filtered_df["avg_rating"].max()
-            if max_r > min_r:
-                filtered_df["rating_norm"] = (filtered_df["avg_rating"] - min_r) / (max_r - min_r)
-            else:
-                filtered_df["rating_norm"] = 0.5
-        else:
-            filtered_df["rating_norm"] = 0.2
-
-        filtered_df["similarity"] = (
-            0.9 * filtered_df["similarity"] + 0.1 * filtered_df["rating_norm"]
+        scores = blend_rating(
+            filtered_df["similarity"].to_numpy(dtype=np.float64),
+            filtered_df["avg_rating"].to_numpy(dtype=np.float64, na_value=np.nan),
         )
-        filtered_df = filtered_df.sort_values(by="similarity", ascending=False)
+        order = np.argsort(-scores, kind="stable")  # NaN scores go last, as in sort_values
+        filtered_df = filtered_df.iloc[order].assign(similarity=scores[order])
 
     if filtered_df.empty:
         st.error("😔 Sorry, no books matched your request.")
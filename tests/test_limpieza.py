@@ -0,0 +1,96 @@
+"""Equivalencia entre `clean_text` (motor `re`) y `clean_series` (RE2 vía Arrow)."""
+import importlib.util
+import random
+from pathlib import Path
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+_SPEC = importlib.util.spec_from_file_location(
+    "limpieza", Path(__file__).resolve().parent.parent / "2 - Limpieza.py"
+)
+limpieza = importlib.util.module_from_spec(_SPEC)
+_SPEC.loader.exec_module(limpieza)
+
+UNICODE_SPACES = [c for c in map(chr, range(0x3001)) if c.isspace()]
+
+ADVERSARIAL = [
+    "see http://x.com\xa0next word",
+    "http://a.b/c next",
+    "www.example.org　tail",
+    "[١٢] arabic-indic digits [12] ascii digits",
+    "see\xa0also the rest",
+    "from Wikipedia, the free encyclopedia",
+    "GOODREADS and GoodReads",
+    "(Kelvin K sign) and (long ſ s)",
+    "goodreadſ review",
+    "ſee alſo GOODREADS",
+    "(pronunciation: ˈhɛləʊ)",
+    "[a wikipedia note] (goodreads summary) [x] (y)",
+    "&lt;b&gt;escaped&lt;/b&gt; &amp; <i>real</i>",
+    "**bold** __under__ ## heading --- dash —— em",
+    "“curly” «angle» 'single' \"double\"",
+    "\t\n\r\f\v\x1c\x1d\x1e\x1f\x85",
+    "",
+]
+ADVERSARIAL += [f"see http://x.com{c}next" for c in UNICODE_SPACES]
+ADVERSARIAL += [f"see{c}also this" for c in UNICODE_SPACES]
+
+
+def _fuzz_cases(n=2000, seed=0):
+    rng = random.Random(seed)
+    tokens = [
+        "http://", "www.", "wikipedia", "goodreads", "see", "also", "from", "[", "]",
+        "(", ")", "<", ">", "&amp;", "language", "pronunciation", "*", "#", "_", "--",
+        "—", "\"", "’", "7", "٣", "a", "Z", "K", "ſ", "é",
+    ] + UNICODE_SPACES
+    return ["".join(rng.choice(tokens) for _ in range(rng.randint(1, 25))) for _ in range(n)]
+
+
+@pytest.mark.parametrize("cases", [ADVERSARIAL, _fuzz_cases()], ids=["adversarial", "fuzz"])
+def test_clean_series_matches_clean_text(cases):
+    expected = [limpieza.clean_text(t) for t in cases]
+    got = limpieza.clean_series(pd.Series(cases)).tolist()
+    mismatches = [(t, e, g) for t, e, g in zip(cases, expected, got) if e != g]
+    assert not mismatches, mismatches[:5]
+
+
+SCARAMOUCHE = (
+    "Idealism can be transferred from one person to another on a vehicle called revenge."
+    "\r\n\r\n[from Wikipedia: \r\nScaramouche tells the story of a young lawyer during "
+    "the French Revolution. The book also depicts his transformation from cynic to idealist.]"
+)
+
+
+@pytest.mark.parametrize("clean", ["text", "series"])
+def test_reference_brackets_do_not_span_lines(clean):
+    # OL108456W: una referencia abierta en una línea no debe tragarse la sinopsis
+    if clean == "text":
+        out = limpieza.clean_text(SCARAMOUCHE)
+    else:
+        out = limpieza.clean_series(pd.Series([SCARAMOUCHE]))[0]
+    assert "Scaramouche tells the story of a young lawyer" in out
+    assert out.startswith("Idealism can be transferred")
+
+
+@pytest.mark.parametrize("clean", ["text", "series"])
+def test_numeric_footnote_inside_reference(clean):
+    # La nota [12] se quita primero; luego el corchete de wikipedia cierra en "foo]"
+    text = "[wikipedia [12] foo] end"
+    if clean == "text":
+        out = limpieza.clean_text(text)
+    else:
+        out = limpieza.clean_series(pd.Series([text]))[0]
+    assert out == "end"
+
+
+def test_read_books_csv_with_empty_text_column(tmp_path):
+    # Una columna vacía en todas las filas no debe llegar como `null[pyarrow]`
+    path = tmp_path / "books.csv"
+    path.write_text(
+        "work_id,title,authors,description,avg_rating\nOL1W,A,B,,\nOL2W,C,D,,\n", encoding="utf-8"
+    )
+    df = limpieza.clean_dataframe(limpieza.read_books_csv(path))
+    assert df.empty